@@ -7,7 +7,7 @@ Author: Craig444444444
 
 from .core import QuantumSteganography
 from .modes import SteganoMode
-from .utils import generate_pq_hash, create_fractal_header
+from .utils import generate_pq_hash, generate_pq_hash_batch, create_fractal_header
 from .quantum_features import QuantumFeatures, QuantumMetadata
 from .security import QuantumSecurity
 
@@ -16,6 +16,7 @@ __all__ = [
     "QuantumSteganography",
     "SteganoMode",
     "generate_pq_hash",
+    "generate_pq_hash_batch",
     "create_fractal_header",
     "QuantumFeatures",
     "QuantumMetadata",
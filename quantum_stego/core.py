@@ -17,6 +17,7 @@ from typing import Optional, Tuple, Dict
 from .modes import SteganoMode
 from .quantum_features import QuantumFeatures, QuantumMetadata
 from .exceptions import *
+from .utils import PHI, generate_pq_hash, generate_pq_hash_batch
 from genesis_engine.temporal_superposition import TemporalAnalyzer
 from genesis_engine.paradox_resolver import EthicalValidator
 
@@ -67,6 +68,17 @@ class QuantumSteganography:
         
         self.mode = self._initialize_mode()
         
+        # generate_pq_hash is salted per call, so hash each known file type
+        # once and reuse it for both encode and decode lookups
+        self._file_type_hashes = dict(zip(
+            self.FILE_TYPE_MAP,
+            generate_pq_hash_batch(self.FILE_TYPE_MAP)
+        ))
+        self._hash_to_file_type = {
+            data_hash: file_type
+            for file_type, data_hash in self._file_type_hashes.items()
+        }
+        
     def _setup_logging(self):
         """Configure quantum-aware logging."""
         log_path = self.workspace_dir / "quantum_stego.log"
@@ -79,8 +91,7 @@ class QuantumSteganography:
         
     def _initialize_mode(self) -> SteganoMode:
         """Initialize steganography mode using φ-modulated dynamics."""
-        phi = (1 + 5 ** 0.5) / 2
-        chaos_factor = self.CHAOS_INTENSITY * phi % 1
+        chaos_factor = self.CHAOS_INTENSITY * PHI % 1
         
         if chaos_factor > 0.8:
             return SteganoMode.PSI  # Quantum superposition mode
@@ -88,6 +99,15 @@ class QuantumSteganography:
             return SteganoMode.PHI  # Golden ratio mode
         return SteganoMode.TAU      # Technical mode
     
+    def _file_type_hash(self, file_type: str) -> str:
+        """Return the cached embedding hash for a file type."""
+        # Only known types are cached: decode can't resolve any other type,
+        # and caching caller-supplied strings would grow without bound
+        data_hash = self._file_type_hashes.get(file_type)
+        if data_hash is None:
+            data_hash = generate_pq_hash(file_type)
+        return data_hash
+    
     def encode(self, 
               input_path: str, 
               output_path: str, 
@@ -123,7 +143,7 @@ class QuantumSteganography:
                 self.temporal_analyzer.analyze_pattern(transformed_data)
             
             # Original encoding logic
-            success = self.mode.encode(img, generate_pq_hash(file_type))
+            success = self.mode.encode(img, self._file_type_hash(file_type))
             
             if success:
                 # Record successful operation
@@ -147,33 +167,37 @@ class QuantumSteganography:
     
     def decode(self, 
               image_path: str,
-              validate_temporal: bool = True) -> str:
-        """Enhanced decode with quantum features and temporal validation."""
+              validate_temporal: bool = True,
+              inverse_transform: bool = True) -> str:
+        """
+        Enhanced decode with quantum features and temporal validation.
+        
+        With inverse_transform=False the full-image float transform is
+        skipped and only the payload rows are read by the mode decoder.
+        """
         try:
             img = Image.open(image_path).convert("RGB")
-            img_array = np.array(img)
+            check_temporal = validate_temporal and self.temporal_analyzer
+            img_array = np.array(img) if inverse_transform or check_temporal else None
             
             # Validate temporal patterns
-            if validate_temporal and self.temporal_analyzer:
+            if check_temporal:
                 if not self.temporal_analyzer.validate_pattern(img_array):
                     raise QuantumStateError("Temporal pattern validation failed")
             
-            # Apply inverse quantum transformation
-            transformed_data = self.quantum_features.apply_quantum_transform(-img_array)
-            img = Image.fromarray(np.uint8(transformed_data))
-            
-            # Record quantum state
-            self.metadata.record_quantum_state(transformed_data)
+            if inverse_transform:
+                # Apply inverse quantum transformation
+                transformed_data = self.quantum_features.apply_quantum_transform(-img_array)
+                img = Image.fromarray(np.uint8(transformed_data))
+                
+                # Record quantum state
+                self.metadata.record_quantum_state(transformed_data)
             
             # Decode using appropriate mode
             decoded_hash = self.mode.decode(img)
             
             # Match hash to file type
-            for file_type in self.FILE_TYPE_MAP:
-                if generate_pq_hash(file_type) == decoded_hash:
-                    return file_type
-            
-            return "unknown"
+            return self._hash_to_file_type.get(decoded_hash, "unknown")
             
         except QuantumStateError as qse:
             self.logger.error(f"Quantum state error during decode: {qse}")
@@ -188,5 +212,5 @@ class QuantumSteganography:
             'phi_correlations': self.metadata.phi_modulation_history,
             'quantum_states': len(self.metadata.quantum_states),
             'last_operation': self.metadata.creation_time.isoformat(),
-            'entropy_pool_size': len(self.quantum_features.entropy_pool)
+            'entropy_pool_size': self.quantum_features.entropy_available
         }
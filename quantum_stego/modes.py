@@ -8,7 +8,43 @@ Author: Craig444444444
 from enum import Enum
 from PIL import Image
 import numpy as np
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
+
+_PAYLOAD_BITS = 512  # 64 bytes * 8 bits
+
+# Per-byte (R, G, B) keep-mask and bit weights for τ-mode embedding:
+# R takes the bit at position 1 (clearing bits 0-1), G at position 0
+_TAU_KEEP_MASK = np.array([0xFC, 0xFE, 0xFF], dtype=np.uint8)
+_TAU_BIT_WEIGHTS = np.array([0b10, 0b01, 0b00], dtype=np.uint8)
+
+# Embedding positions: a list of (x, y) tuples or an N×2 integer array
+Positions = Union[List[Tuple[int, int]], np.ndarray]
+
+# Byte -> 8-bit (MSB first) lookup table, built once at import
+_BYTE_TO_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+
+def _hash_to_bits(data_hash: str) -> np.ndarray:
+    """Expand a latin-1 hash string into a flat uint8 array of bits (MSB first)."""
+    return _BYTE_TO_BITS[np.frombuffer(data_hash.encode('latin-1'), dtype=np.uint8)].ravel()
+
+def _payload_region(img: Image.Image, n_bits: int) -> Image.Image:
+    """Crop the leading image rows needed to hold n_bits, one bit per pixel."""
+    rows = min(img.height, -(-n_bits // img.width))
+    return img.crop((0, 0, img.width, rows))
+
+def _payload_array(img: Image.Image) -> np.ndarray:
+    """Read only the leading image rows that can hold the payload bits."""
+    return np.asarray(_payload_region(img, _PAYLOAD_BITS))
+
+def _store_region(img: Image.Image, region: Image.Image, arr: np.ndarray) -> None:
+    """Write modified leading rows back into the top of the source image."""
+    region.frombytes(arr.tobytes())
+    img.paste(region, (0, 0))
+
+def _bits_to_str(bits: np.ndarray) -> str:
+    """Pack whole bytes from a bit array (MSB first) back into a string."""
+    bits = bits[:bits.size - bits.size % 8]
+    return np.packbits(bits).tobytes().decode('latin-1')
 
 class SteganoMode(Enum):
     """
@@ -22,7 +58,7 @@ class SteganoMode(Enum):
     def encode(self, 
                img: Image.Image, 
                data_hash: str,
-               positions: Optional[List[Tuple[int, int]]] = None) -> bool:
+               positions: Optional[Positions] = None) -> bool:
         """
         Encode data using the selected mode's algorithm.
         """
@@ -49,18 +85,18 @@ class SteganoMode(Enum):
         if img.mode != "RGBA":
             img = img.convert("RGBA")
         
-        pixels = img.load()
-        width, height = img.size
-        binary_data = ''.join(format(ord(c), '08b') for c in data_hash)
-        
         try:
-            for i, bit in enumerate(binary_data):
-                if i >= width * height:
-                    break
-                x, y = i % width, i // width
-                r, g, b, a = pixels[x, y]
-                a = (a & ~1) | int(bit)
-                pixels[x, y] = (r, g, b, a)
+            bits = _hash_to_bits(data_hash)
+            if bits.size > img.width * img.height:
+                return False
+            region = _payload_region(img, bits.size)
+            arr = np.array(region)
+            
+            # Alpha-channel LSB embedding, touching only the alpha plane
+            payload = arr.reshape(-1, 4)[:bits.size, 3]
+            payload &= np.uint8(0xFE)
+            payload |= bits
+            _store_region(img, region, arr)
             return True
         except Exception:
             return False
@@ -68,49 +104,55 @@ class SteganoMode(Enum):
     def _encode_phi(self, 
                    img: Image.Image, 
                    data_hash: str,
-                   positions: Optional[List[Tuple[int, int]]] = None) -> bool:
+                   positions: Optional[Positions] = None) -> bool:
         """Golden ratio mode encoding."""
-        pixels = img.load()
-        binary_data = ''.join(format(ord(c), '08b') for c in data_hash)
-        
         try:
-            if positions:
-                for i, bit in enumerate(binary_data):
-                    if i >= len(positions):
-                        break
-                    x, y = positions[i]
-                    r, g, b = pixels[x, y]
-                    r = (r & ~1) | int(bit)
-                    pixels[x, y] = (r, g, b)
+            bits = _hash_to_bits(data_hash)
+            
+            if positions is not None and len(positions) > 0:
+                arr = np.array(img)
+                if arr.ndim != 3 or arr.shape[2] != 3:
+                    return False
+                n = min(bits.size, len(positions))
+                pos = np.asarray(positions[:n], dtype=np.intp).reshape(-1, 2)
+                # 2-D fancy indexing keeps PixelAccess semantics: negative
+                # coordinates wrap, out-of-range ones raise IndexError
+                ys, xs = pos[:, 1], pos[:, 0]
+                arr[ys, xs, 0] = (arr[ys, xs, 0] & np.uint8(0xFE)) | bits[:n]
+                img.frombytes(arr.tobytes())
             else:
                 # Default sequential embedding if no positions provided
-                width, height = img.size
-                for i, bit in enumerate(binary_data):
-                    if i >= width * height:
-                        break
-                    x, y = i % width, i // width
-                    r, g, b = pixels[x, y]
-                    r = (r & ~1) | int(bit)
-                    pixels[x, y] = (r, g, b)
+                if bits.size > img.width * img.height:
+                    return False
+                region = _payload_region(img, bits.size)
+                arr = np.array(region)
+                if arr.ndim != 3 or arr.shape[2] != 3:
+                    return False
+                payload = arr.reshape(-1, 3)[:bits.size, 0]
+                payload &= np.uint8(0xFE)
+                payload |= bits
+                _store_region(img, region, arr)
             return True
         except Exception:
             return False
     
     def _encode_tau(self, img: Image.Image, data_hash: str) -> bool:
         """Technical mode encoding using multi-channel LSB."""
-        pixels = img.load()
-        width, height = img.size
-        binary_data = ''.join(format(ord(c), '08b') for c in data_hash)
-        
         try:
-            for i, bit in enumerate(binary_data):
-                if i >= width * height:
-                    break
-                x, y = i % width, i // width
-                r, g, b = pixels[x, y]
-                r = (r & ~0b11) | (int(bit) << 1)
-                g = (g & ~0b1) | int(bit)
-                pixels[x, y] = (r, g, b)
+            bits = _hash_to_bits(data_hash)
+            if bits.size > img.width * img.height:
+                return False
+            region = _payload_region(img, bits.size)
+            arr = np.array(region)
+            if arr.ndim != 3 or arr.shape[2] != 3:
+                return False
+            
+            # One AND + OR over the contiguous leading pixels, all channels
+            # at once, instead of two strided per-channel updates
+            pixels = arr.reshape(-1, 3)[:bits.size]
+            pixels &= _TAU_KEEP_MASK
+            pixels |= bits[:, None] * _TAU_BIT_WEIGHTS
+            _store_region(img, region, arr)
             return True
         except Exception:
             return False
@@ -119,71 +161,32 @@ class SteganoMode(Enum):
         """Quantum superposition mode decoding."""
         if img.mode != "RGBA":
             return ""
-            
-        pixels = img.load()
-        width, height = img.size
-        binary_data = ""
         
         try:
-            for y in range(height):
-                for x in range(width):
-                    if len(binary_data) >= 512:  # 64 bytes * 8 bits
-                        break
-                    _, _, _, a = pixels[x, y]
-                    binary_data += str(a & 1)
-                    
-            # Convert binary to string
-            chars = []
-            for i in range(0, len(binary_data), 8):
-                byte = binary_data[i:i+8]
-                if len(byte) == 8:
-                    chars.append(chr(int(byte, 2)))
-            return ''.join(chars)
+            arr = _payload_array(img)
+            bits = arr.reshape(-1, 4)[:_PAYLOAD_BITS, 3] & 1
+            return _bits_to_str(bits)
         except Exception:
             return ""
     
     def _decode_phi(self, img: Image.Image) -> str:
         """Golden ratio mode decoding."""
-        pixels = img.load()
-        width, height = img.size
-        binary_data = ""
-        
         try:
-            for y in range(height):
-                for x in range(width):
-                    if len(binary_data) >= 512:
-                        break
-                    r, _, _ = pixels[x, y]
-                    binary_data += str(r & 1)
-                    
-            chars = []
-            for i in range(0, len(binary_data), 8):
-                byte = binary_data[i:i+8]
-                if len(byte) == 8:
-                    chars.append(chr(int(byte, 2)))
-            return ''.join(chars)
+            arr = _payload_array(img)
+            if arr.ndim != 3 or arr.shape[2] != 3:
+                return ""
+            bits = arr.reshape(-1, 3)[:_PAYLOAD_BITS, 0] & 1
+            return _bits_to_str(bits)
         except Exception:
             return ""
     
     def _decode_tau(self, img: Image.Image) -> str:
         """Technical mode decoding."""
-        pixels = img.load()
-        width, height = img.size
-        binary_data = ""
-        
         try:
-            for y in range(height):
-                for x in range(width):
-                    if len(binary_data) >= 512:
-                        break
-                    r, _, _ = pixels[x, y]
-                    binary_data += str((r >> 1) & 1)
-                    
-            chars = []
-            for i in range(0, len(binary_data), 8):
-                byte = binary_data[i:i+8]
-                if len(byte) == 8:
-                    chars.append(chr(int(byte, 2)))
-            return ''.join(chars)
+            arr = _payload_array(img)
+            if arr.ndim != 3 or arr.shape[2] != 3:
+                return ""
+            bits = (arr.reshape(-1, 3)[:_PAYLOAD_BITS, 0] >> 1) & 1
+            return _bits_to_str(bits)
         except Exception:
             return ""
@@ -5,10 +5,12 @@ Created: 2025-05-09 06:19:29 UTC
 Author: Craig444444444
 """
 
+import hashlib
 import numpy as np
 from datetime import datetime
 from typing import Optional, Tuple, List
 from .exceptions import QuantumStateError, PhiModulationError, EntropyPoolError
+from .utils import PHI
 
 class QuantumFeatures:
     """
@@ -19,46 +21,66 @@ class QuantumFeatures:
     """
     
     def __init__(self, entropy_pool_size: int = 1024):
-        self.phi = (1 + 5 ** 0.5) / 2
+        self.phi = PHI
+        self._rng = np.random.default_rng()
         self.entropy_pool = self._initialize_entropy_pool(entropy_pool_size)
+        self._entropy_cursor = 0
         self.last_quantum_state = None
         
     def _initialize_entropy_pool(self, size: int) -> np.ndarray:
         """Initialize quantum-inspired entropy pool."""
         try:
-            # Generate φ-modulated random values
-            pool = np.random.random(size) * self.phi
-            pool = pool % 1  # Normalize to [0,1]
+            # Fixed-size buffer, refilled in place as it is consumed
+            pool = np.empty(size, dtype=np.float64)
+            self._fill_entropy(pool)
             return pool
         except Exception as e:
             raise EntropyPoolError(f"Failed to initialize entropy pool: {e}")
     
+    def _fill_entropy(self, out: np.ndarray):
+        """Fill a buffer in place with φ-modulated random values in [0,1)."""
+        self._rng.random(out=out)
+        np.multiply(out, self.phi, out=out)
+        np.mod(out, 1, out=out)
+    
     def get_quantum_entropy(self, size: int = 1) -> np.ndarray:
         """Get quantum-inspired entropy from pool."""
-        if len(self.entropy_pool) < size:
-            self._replenish_entropy_pool()
+        if self.entropy_available < size:
+            self._replenish_entropy_pool(size)
         
-        values = self.entropy_pool[:size]
-        self.entropy_pool = self.entropy_pool[size:]
+        start = self._entropy_cursor
+        # Copy out, since the pool buffer is overwritten on replenish
+        values = self.entropy_pool[start:start + size].copy()
+        self._entropy_cursor += len(values)
         return values
     
-    def _replenish_entropy_pool(self):
+    @property
+    def entropy_available(self) -> int:
+        """Number of unconsumed values left in the entropy pool."""
+        return len(self.entropy_pool) - self._entropy_cursor
+    
+    def _replenish_entropy_pool(self, size: int = 0):
         """Replenish entropy pool using φ-modulation."""
         try:
-            new_entropy = np.random.random(1024) * self.phi
-            self.entropy_pool = np.concatenate([
-                self.entropy_pool,
-                new_entropy % 1
-            ])
+            remaining = self.entropy_available
+            pool = self.entropy_pool
+            if remaining + size > len(pool):
+                # Grow only when a single draw exceeds the buffer
+                pool = np.empty(remaining + size, dtype=np.float64)
+            
+            # Shift the unconsumed tail to the front and refill the rest
+            pool[:remaining] = self.entropy_pool[self._entropy_cursor:]
+            self._fill_entropy(pool[remaining:])
+            self.entropy_pool = pool
+            self._entropy_cursor = 0
         except Exception as e:
             raise EntropyPoolError(f"Failed to replenish entropy pool: {e}")
     
     def apply_quantum_transform(self, data: np.ndarray) -> np.ndarray:
         """Apply quantum-inspired transformation to data."""
         try:
-            # φ-modulated phase transformation
-            phase = np.exp(2j * np.pi * self.phi * data)
-            transformed = np.real(phase * data)
+            # φ-modulated phase transformation (real part of e^{2πiφx}·x)
+            transformed = np.cos(2 * np.pi * self.phi * data) * data
             self.last_quantum_state = transformed
             return transformed
         except Exception as e:
@@ -72,8 +94,7 @@ class QuantumFeatures:
         try:
             for i in range(num_states):
                 phase = self.get_quantum_entropy()
-                state = data * np.exp(2j * np.pi * phase)
-                states.append(np.real(state))
+                states.append(data * np.cos(2 * np.pi * phase))
             return states
         except Exception as e:
             raise QuantumStateError(f"Superposition generation failed: {e}")
@@ -108,15 +129,21 @@ class QuantumMetadata:
             )
     
     def _hash_state(self, state: np.ndarray) -> str:
-        """Generate quantum-resistant hash of state."""
-        return hashlib.sha3_512(state.tobytes()).hexdigest()
+        """Generate a fast identity hash of state for logging and transitions."""
+        h = hashlib.blake2b(digest_size=32)
+        # Hash the array buffer in place rather than copying via tobytes()
+        h.update(np.ascontiguousarray(state))
+        return h.hexdigest()
     
     def _calculate_phi_correlation(self, state: np.ndarray) -> float:
-        """Calculate correlation with φ."""
+        """
+        Calculate correlation with φ.
+        
+        Pearson correlation against a constant φ vector is always undefined
+        (NaN), so the state is instead scored as its mean normalised by φ.
+        """
         try:
-            phi = (1 + 5 ** 0.5) / 2
-            correlation = np.corrcoef(state.flatten(), 
-                                   np.full_like(state.flatten(), phi))[0,1]
+            correlation = float(np.mean(state) / PHI) if state.size else 0.0
             self.phi_modulation_history.append(correlation)
             return correlation
         except Exception:
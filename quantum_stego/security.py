@@ -5,24 +5,37 @@ Created: 2025-05-09 06:21:51 UTC
 Author: Craig444444444
 """
 
+import hashlib
+import struct
+import time
 import numpy as np
 from typing import Optional, Tuple, List
-from datetime import datetime
+from datetime import datetime, timezone
 from .exceptions import QuantumSecurityError
+from .utils import PHI
 
 class QuantumSecurity:
     def __init__(self):
-        self.phi = (1 + 5 ** 0.5) / 2
+        self.phi = PHI
+        self._rng = np.random.default_rng()
         self.security_log = []
+        self._operation_counts = {}
         self.quantum_noise = None
+        self._watermark_buf = None
+        self._noise_centered = None
+        self._noise_sq_norm = 0.0
         self._initialize_quantum_noise()
         
     def _initialize_quantum_noise(self):
         """Initialize quantum-inspired noise patterns."""
         try:
             size = 1024
-            phase = np.exp(2j * np.pi * self.phi * np.random.random(size))
-            self.quantum_noise = np.real(phase)
+            self.quantum_noise = np.cos(2 * np.pi * self.phi * self._rng.random(size))
+            self._watermark_buf = np.empty_like(self.quantum_noise)
+            
+            # Noise statistics reused by every watermark verification
+            self._noise_centered = self.quantum_noise - self.quantum_noise.mean()
+            self._noise_sq_norm = float(self._noise_centered @ self._noise_centered)
         except Exception as e:
             raise QuantumSecurityError(f"Failed to initialize quantum noise: {e}")
     
@@ -38,15 +51,18 @@ class QuantumSecurity:
         """
         try:
             timestamp = datetime.utcnow().timestamp()
-            watermark = np.sin(self.phi * timestamp) * self.quantum_noise
+            watermark = np.multiply(
+                self.quantum_noise,
+                np.sin(self.phi * timestamp),
+                out=self._watermark_buf
+            )
             
             # Log watermark application
-            self.security_log.append({
-                'timestamp': datetime.utcnow().isoformat(),
-                'operation': 'watermark_applied',
-                'data_shape': data.shape,
-                'watermark_strength': float(np.mean(np.abs(watermark)))
-            })
+            self._log_operation(
+                'watermark_applied',
+                data_shape=data.shape,
+                watermark_strength=float(np.mean(np.abs(watermark)))
+            )
             
             return data + watermark.reshape(-1, 1) * 0.1
             
@@ -64,18 +80,28 @@ class QuantumSecurity:
             Boolean indicating if watermark is valid
         """
         try:
-            correlation = np.corrcoef(
-                data.flatten(),
-                self.quantum_noise.repeat(len(data.flatten()) // len(self.quantum_noise))
-            )[0,1]
+            flat = data.ravel()
+            n = flat.size
+            reps = n // self.quantum_noise.size
+            if reps == 0 or reps * self.quantum_noise.size != n:
+                raise ValueError(
+                    f"data size {n} is not a multiple of noise size "
+                    f"{self.quantum_noise.size}"
+                )
+            
+            # Pearson correlation against the noise with each sample repeated
+            # `reps` times, without materialising the repeated copy
+            block_sums = flat.reshape(self.quantum_noise.size, reps).sum(axis=1)
+            covariance = self._noise_centered @ block_sums
+            data_sq_dev = n * flat.var()
+            correlation = covariance / np.sqrt(data_sq_dev * reps * self._noise_sq_norm)
             
             # Log verification attempt
-            self.security_log.append({
-                'timestamp': datetime.utcnow().isoformat(),
-                'operation': 'watermark_verified',
-                'correlation': float(correlation),
-                'result': bool(abs(correlation) > 0.1)
-            })
+            self._log_operation(
+                'watermark_verified',
+                correlation=float(correlation),
+                result=bool(abs(correlation) > 0.1)
+            )
             
             return abs(correlation) > 0.1
             
@@ -97,26 +123,35 @@ class QuantumSecurity:
         """
         try:
             # Generate quantum key
-            key_hash = hash(key + str(self.phi))
-            np.random.seed(key_hash)
-            quantum_key = np.random.random(len(data.flatten()))
-            
-            # Apply encryption
-            encrypted = data.flatten() * np.exp(2j * np.pi * quantum_key)
-            encrypted = np.real(encrypted).reshape(data.shape)
+            h = hashlib.blake2b(digest_size=16)
+            h.update(key.encode())
+            h.update(struct.pack('<d', self.phi))
+            key_hash = int.from_bytes(h.digest()[:8], 'little')
+            rng = np.random.default_rng(key_hash)
+            flat = data.ravel()
+            quantum_key = rng.random(flat.size, dtype=np.float32)
+            
+            # Apply encryption; the key stream is stored as float32 but the
+            # phase is evaluated in float64 so output dtype follows the data
+            # as np.real(data * exp(2j*pi*key)) always did
+            phase = np.multiply(quantum_key, 2 * np.pi, dtype=np.float64)
+            if np.iscomplexobj(flat):
+                encrypted = np.real(flat * np.exp(1j * phase))
+            else:
+                encrypted = flat * np.cos(phase, out=phase)
+            encrypted = encrypted.reshape(data.shape)
             
             # Generate verification token
-            token = hash(str(encrypted.sum()) + str(self.phi))
+            token = self._verification_token(encrypted)
             
             # Log encryption operation
-            self.security_log.append({
-                'timestamp': datetime.utcnow().isoformat(),
-                'operation': 'encryption_applied',
-                'data_shape': data.shape,
-                'token_generated': str(token)[:16]  # First 16 chars for security
-            })
+            self._log_operation(
+                'encryption_applied',
+                data_shape=data.shape,
+                token_generated=token[:16]  # First 16 chars for security
+            )
             
-            return encrypted, str(token)
+            return encrypted, token
             
         except Exception as e:
             raise QuantumSecurityError(f"Encryption failed: {e}")
@@ -135,21 +170,48 @@ class QuantumSecurity:
             Boolean indicating if encryption is valid
         """
         try:
-            computed_token = hash(str(data.sum()) + str(self.phi))
-            result = str(computed_token) == token
+            result = self._verification_token(data) == token
             
             # Log verification attempt
-            self.security_log.append({
-                'timestamp': datetime.utcnow().isoformat(),
-                'operation': 'encryption_verified',
-                'result': result
-            })
+            self._log_operation('encryption_verified', result=result)
             
             return result
             
         except Exception as e:
             raise QuantumSecurityError(f"Encryption verification failed: {e}")
     
+    def _log_operation(self, operation: str, **details):
+        """Append a log entry stamped with an integer nanosecond timestamp."""
+        entry = {'timestamp': time.time_ns(), 'operation': operation}
+        entry.update(details)
+        self.security_log.append(entry)
+        self._operation_counts[operation] = self._operation_counts.get(operation, 0) + 1
+    
+    @staticmethod
+    def _format_log_entry(entry: dict) -> dict:
+        """Copy a log entry with its timestamp rendered as UTC ISO-8601."""
+        formatted = dict(entry)
+        formatted['timestamp'] = datetime.fromtimestamp(
+            entry['timestamp'] / 1e9, tz=timezone.utc
+        ).replace(tzinfo=None).isoformat()
+        return formatted
+    
+    def export_security_log(self) -> List[dict]:
+        """
+        Export the security log with human-readable timestamps.
+        
+        Returns:
+            List of log entries with ISO-8601 UTC timestamps
+        """
+        return [self._format_log_entry(entry) for entry in self.security_log]
+    
+    def _verification_token(self, data: np.ndarray) -> str:
+        """Derive a deterministic verification token from raw array bytes."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.ascontiguousarray(data))
+        h.update(struct.pack('<d', self.phi))
+        return h.hexdigest()
+    
     def get_security_metrics(self) -> dict:
         """
         Get quantum security metrics.
@@ -158,14 +220,17 @@ class QuantumSecurity:
             Dictionary containing security metrics
         """
         try:
-            operations = [log['operation'] for log in self.security_log]
+            counts = self._operation_counts
             return {
                 'total_operations': len(self.security_log),
-                'watermarks_applied': operations.count('watermark_applied'),
-                'watermarks_verified': operations.count('watermark_verified'),
-                'encryptions_applied': operations.count('encryption_applied'),
-                'encryptions_verified': operations.count('encryption_verified'),
-                'last_operation': self.security_log[-1] if self.security_log else None,
+                'watermarks_applied': counts.get('watermark_applied', 0),
+                'watermarks_verified': counts.get('watermark_verified', 0),
+                'encryptions_applied': counts.get('encryption_applied', 0),
+                'encryptions_verified': counts.get('encryption_verified', 0),
+                'last_operation': (
+                    self._format_log_entry(self.security_log[-1])
+                    if self.security_log else None
+                ),
                 'quantum_noise_entropy': float(np.std(self.quantum_noise))
             }
         except Exception as e:
@@ -174,3 +239,4 @@ class QuantumSecurity:
     def clear_security_log(self):
         """Clear security operation log."""
         self.security_log = []
+        self._operation_counts = {}
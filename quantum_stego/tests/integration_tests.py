@@ -6,6 +6,7 @@ Author: Craig444444444
 """
 
 import unittest
+from unittest import mock
 import numpy as np
 from PIL import Image
 import os
@@ -16,6 +17,11 @@ from quantum_stego.core import QuantumSteganography
 from quantum_stego.modes import SteganoMode
 from quantum_stego.quantum_features import QuantumFeatures, QuantumMetadata
 from quantum_stego.security import QuantumSecurity
+from quantum_stego import utils
+from quantum_stego.utils import (
+    PHI, generate_pq_hash_batch, calculate_checksum,
+    embed_checksum, extract_checksum
+)
 from quantum_stego.exceptions import *
 
 class TestQuantumSteganographyIntegration(unittest.TestCase):
@@ -40,11 +46,10 @@ class TestQuantumSteganographyIntegration(unittest.TestCase):
     @staticmethod
     def _create_test_image(size=(100, 100)):
         """Create test image with φ-modulated patterns."""
-        phi = (1 + 5 ** 0.5) / 2
-        x = np.linspace(0, 1, size[0])
-        y = np.linspace(0, 1, size[1])
-        X, Y = np.meshgrid(x, y)
-        Z = np.sin(2 * np.pi * phi * X) * np.cos(2 * np.pi * phi * Y)
+        phi = PHI
+        x = np.linspace(0, 1, size[0])[None, :]
+        y = np.linspace(0, 1, size[1])[:, None]
+        Z = np.sin(2 * np.pi * phi * x) * np.cos(2 * np.pi * phi * y)
         img_array = ((Z + 1) * 127.5).astype(np.uint8)
         return Image.fromarray(img_array)
     
@@ -73,6 +78,30 @@ class TestQuantumSteganographyIntegration(unittest.TestCase):
         except Exception as e:
             self.fail(f"Encryption workflow failed: {e}")
     
+    def test_decode_without_inverse_transform(self):
+        """Test decoding directly from the payload rows."""
+        try:
+            file_type = "text/plain"
+            encoded_path = self.test_dir / "raw_encoded_image.png"
+            
+            # Embed without the forward transform, so no inverse is needed
+            img = self.test_image.convert("RGB")
+            with mock.patch.object(self.stego, "mode", SteganoMode.TAU):
+                self.assertTrue(self.stego.mode.encode(
+                    img, self.stego._file_type_hash(file_type)
+                ))
+                img.save(encoded_path)
+                
+                decoded = self.stego.decode(
+                    str(encoded_path),
+                    validate_temporal=False,
+                    inverse_transform=False
+                )
+            self.assertEqual(decoded, file_type)
+            
+        except Exception as e:
+            self.fail(f"Decode without inverse transform failed: {e}")
+    
     def test_quantum_features_integration(self):
         """Test quantum features integration."""
         try:
@@ -90,6 +119,42 @@ class TestQuantumSteganographyIntegration(unittest.TestCase):
         except Exception as e:
             self.fail(f"Quantum features integration failed: {e}")
     
+    def test_entropy_pool_integration(self):
+        """Test entropy draws across pool refills and oversized requests."""
+        try:
+            features = QuantumFeatures(entropy_pool_size=16)
+            self.assertEqual(features.entropy_available, 16)
+            
+            draws, snapshots = [], []
+            for size in [5, 5, 5, 5, 20, 1, 16, 3]:
+                available = features.entropy_available
+                tail = features.entropy_pool[features._entropy_cursor:].copy()
+                
+                values = features.get_quantum_entropy(size)
+                self.assertEqual(len(values), size)
+                self.assertTrue(np.all((values >= 0) & (values < 1)))
+                
+                if size <= available:
+                    self.assertEqual(features.entropy_available, available - size)
+                else:
+                    # Refill keeps the unconsumed tail at the front
+                    np.testing.assert_array_equal(values[:available], tail)
+                    self.assertEqual(
+                        features.entropy_available,
+                        len(features.entropy_pool) - size
+                    )
+                self.assertGreaterEqual(features.entropy_available, 0)
+                
+                draws.append(values)
+                snapshots.append(values.copy())
+            
+            # Refilling the pool must not alter previously returned draws
+            for values, snapshot in zip(draws, snapshots):
+                np.testing.assert_array_equal(values, snapshot)
+                
+        except Exception as e:
+            self.fail(f"Entropy pool integration failed: {e}")
+    
     def test_security_features_integration(self):
         """Test security features integration."""
         try:
@@ -114,6 +179,74 @@ class TestQuantumSteganographyIntegration(unittest.TestCase):
         except Exception as e:
             self.fail(f"Security features integration failed: {e}")
     
+    def test_encryption_token_determinism(self):
+        """Test that encryption tokens verify across instances."""
+        try:
+            data = np.random.random((16, 8))
+            first, second = QuantumSecurity(), QuantumSecurity()
+            
+            encrypted, token = first.apply_quantum_encryption(data, "test_key")
+            other_encrypted, other_token = second.apply_quantum_encryption(
+                data, "test_key"
+            )
+            np.testing.assert_array_equal(encrypted, other_encrypted)
+            self.assertEqual(token, other_token)
+            self.assertTrue(second.verify_quantum_encryption(encrypted, token))
+            
+            # A different key or a single changed element fails verification
+            wrong_key, _ = first.apply_quantum_encryption(data, "other_key")
+            self.assertFalse(first.verify_quantum_encryption(wrong_key, token))
+            tampered = encrypted.copy()
+            tampered[3, 5] += 1.0
+            self.assertFalse(first.verify_quantum_encryption(tampered, token))
+            
+        except Exception as e:
+            self.fail(f"Encryption token determinism failed: {e}")
+    
+    def test_watermark_correlation(self):
+        """Test the watermark correlation against np.corrcoef."""
+        try:
+            security = QuantumSecurity()
+            noise = security.quantum_noise
+            rng = np.random.default_rng(0)
+            
+            for shape in [(1024,), (1024 * 3,), (1024, 2), (1024, 5)]:
+                reps = int(np.prod(shape)) // 1024
+                data = rng.random(shape) + noise.repeat(reps).reshape(shape)
+                security.verify_quantum_watermark(data)
+                
+                expected = np.corrcoef(data.flatten(), noise.repeat(reps))[0, 1]
+                self.assertAlmostEqual(
+                    security.security_log[-1]['correlation'], expected, places=10
+                )
+            
+            # Sizes that are not a multiple of the noise length are rejected
+            for shape in [(1000,), (1025,), (10, 10)]:
+                with self.assertRaises(QuantumSecurityError):
+                    security.verify_quantum_watermark(np.zeros(shape))
+                
+        except Exception as e:
+            self.fail(f"Watermark correlation failed: {e}")
+    
+    def test_security_log_export(self):
+        """Test exporting the security log with ISO-8601 timestamps."""
+        try:
+            security = QuantumSecurity()
+            security.apply_quantum_encryption(np.random.random((4, 4)), "key")
+            
+            exported = security.export_security_log()
+            self.assertGreater(len(exported), 0)
+            self.assertEqual(len(exported), len(security.security_log))
+            for entry, raw in zip(exported, security.security_log):
+                self.assertEqual(entry['operation'], raw['operation'])
+                self.assertIsInstance(raw['timestamp'], int)
+                self.assertIsInstance(
+                    datetime.fromisoformat(entry['timestamp']), datetime
+                )
+            
+        except Exception as e:
+            self.fail(f"Security log export failed: {e}")
+    
     def test_error_handling(self):
         """Test error handling integration."""
         try:
@@ -145,8 +278,8 @@ class TestQuantumSteganographyIntegration(unittest.TestCase):
         """Test steganography modes integration."""
         try:
             for mode in SteganoMode:
-                # Create test image for each mode
-                test_image = self._create_test_image()
+                # Fresh copy of the shared test image for each mode
+                test_image = self.test_image.copy()
                 
                 # Test encoding
                 result = mode.encode(
@@ -162,6 +295,63 @@ class TestQuantumSteganographyIntegration(unittest.TestCase):
         except Exception as e:
             self.fail(f"Mode integration failed: {e}")
     
+    def test_mode_latin1_round_trip(self):
+        """Test that every mode round-trips a non-ASCII latin-1 payload."""
+        try:
+            data_hash = "café" * 16  # 64 characters, the full payload
+            for mode in SteganoMode:
+                # ψ-mode embeds in alpha, so it needs an RGBA image to keep it
+                image_mode = "RGBA" if mode == SteganoMode.PSI else "RGB"
+                test_image = Image.new(image_mode, (32, 32), "gray")
+                
+                self.assertTrue(mode.encode(test_image, data_hash))
+                self.assertEqual(mode.decode(test_image), data_hash)
+                
+        except Exception as e:
+            self.fail(f"Mode latin-1 round trip failed: {e}")
+    
+    def test_mode_capacity_check(self):
+        """Test that modes refuse payloads larger than the image."""
+        try:
+            data_hash = "a" * 64  # 512 bits, more than 10x10 pixels
+            for mode in SteganoMode:
+                small_image = Image.new("RGB", (10, 10), (100, 150, 200))
+                original = small_image.tobytes()
+                
+                self.assertFalse(mode.encode(small_image, data_hash))
+                self.assertEqual(small_image.tobytes(), original)
+                
+        except Exception as e:
+            self.fail(f"Mode capacity check failed: {e}")
+    
+    def test_phi_mode_array_positions(self):
+        """Test φ-mode embedding at positions given as an N×2 array."""
+        try:
+            data_hash = "test_hash"
+            n_bits = len(data_hash) * 8
+            positions = np.stack([
+                np.arange(n_bits) % 32,
+                np.arange(n_bits) // 32 * 3 + 1
+            ], axis=1)
+            
+            from_list = Image.new("RGB", (32, 32), (100, 150, 200))
+            from_array = from_list.copy()
+            self.assertTrue(SteganoMode.PHI.encode(
+                from_list, data_hash, [tuple(p) for p in positions.tolist()]
+            ))
+            self.assertTrue(SteganoMode.PHI.encode(
+                from_array, data_hash, positions
+            ))
+            self.assertEqual(from_array.tobytes(), from_list.tobytes())
+            
+            # The red-channel LSBs at those positions spell out the hash
+            arr = np.array(from_array)
+            bits = arr[positions[:, 1], positions[:, 0], 0] & 1
+            self.assertEqual(np.packbits(bits).tobytes().decode(), data_hash)
+            
+        except Exception as e:
+            self.fail(f"φ-mode array positions failed: {e}")
+    
     def test_metadata_integration(self):
         """Test metadata integration."""
         try:
@@ -183,6 +373,115 @@ class TestQuantumSteganographyIntegration(unittest.TestCase):
         except Exception as e:
             self.fail(f"Metadata integration failed: {e}")
     
+    def test_pq_hash_batch(self):
+        """Test batched hashing with one salt per item."""
+        try:
+            items = ["text/plain", "text/plain", "image/png"]
+            
+            hashes = generate_pq_hash_batch(items)
+            self.assertEqual(len(hashes), len(items))
+            self.assertTrue(all(len(h) == 64 for h in hashes))
+            # Identical inputs still get independent salts
+            self.assertNotEqual(hashes[0], hashes[1])
+            self.assertTrue(set(hashes).isdisjoint(generate_pq_hash_batch(items)))
+            
+            self.assertEqual(
+                [len(h) for h in generate_pq_hash_batch(items, length=15)],
+                [15] * len(items)
+            )
+            self.assertEqual(generate_pq_hash_batch([]), [])
+            
+        except Exception as e:
+            self.fail(f"Batched pq hash failed: {e}")
+    
+    def test_checksum_integration(self):
+        """Test region checksums and checksum embedding in the header."""
+        try:
+            rng = np.random.default_rng(1)
+            img = Image.fromarray(rng.integers(0, 256, (40, 60, 3), dtype=np.uint8))
+            arr = np.asarray(img)
+            
+            # Reference: φ-modulated fold over pixels, x outer and y inner
+            expected = 0
+            for x in range(3, 9):
+                for y in range(2, 7):
+                    expected = int((expected + int(arr[y, x].sum())) * PHI) % 256
+            self.assertEqual(calculate_checksum(img, (3, 2, 9, 7)), expected)
+            
+            # Images and pre-converted arrays agree, including clamped and
+            # empty regions
+            for region in [(0, 0, 60, 40), (-5, -5, 500, 500), (59, 39, 80, 80),
+                           (10, 10, 10, 10), (30, 5, 20, 2)]:
+                self.assertEqual(
+                    calculate_checksum(img, region),
+                    calculate_checksum(arr, region)
+                )
+            self.assertEqual(calculate_checksum(img, (10, 10, 10, 10)), 0)
+            
+            # The pure Python reduction matches the (possibly compiled) one
+            full = calculate_checksum(img, (0, 0, 60, 40))
+            reduce_py = getattr(utils._checksum_reduce, "py_func",
+                                utils._checksum_reduce)
+            with mock.patch.object(utils, "numba", None), \
+                    mock.patch.object(utils, "_checksum_reduce", reduce_py):
+                self.assertEqual(calculate_checksum(img, (3, 2, 9, 7)), expected)
+                self.assertEqual(calculate_checksum(img, (0, 0, 60, 40)), full)
+            
+            # Non-RGB input is rejected
+            self.assertEqual(calculate_checksum(img.convert("L"), (0, 0, 5, 5)), -1)
+            self.assertEqual(calculate_checksum(arr[..., 0], (0, 0, 5, 5)), -1)
+            
+            # Every 8-bit checksum round-trips through the header
+            header_image = img.copy()
+            for checksum in range(256):
+                embed_checksum(header_image, checksum)
+                self.assertEqual(extract_checksum(header_image), checksum)
+            
+            # Out-of-range checksums leave the image untouched
+            original = header_image.tobytes()
+            for checksum in (-1, 256):
+                embed_checksum(header_image, checksum)
+                self.assertEqual(header_image.tobytes(), original)
+            
+            # Images narrower than the 8-pixel header are left untouched
+            narrow = img.crop((0, 0, 5, 5))
+            original = narrow.tobytes()
+            embed_checksum(narrow, 0xA5)
+            self.assertEqual(narrow.tobytes(), original)
+            self.assertEqual(extract_checksum(narrow), -1)
+            
+        except Exception as e:
+            self.fail(f"Checksum integration failed: {e}")
+    
+    def test_fractal_header_numpy_matches_kernel(self):
+        """Test that the NumPy fallback renders exactly like the Numba kernel."""
+        if utils.numba is None:
+            self.skipTest("Numba is not installed")
+        
+        for width, height in [(1, 1), (37, 5), (120, 80)]:
+            expected = np.array(utils.create_fractal_header(width, height))
+            with mock.patch.object(utils, "numba", None):
+                header = np.array(utils.create_fractal_header(width, height))
+            np.testing.assert_array_equal(header, expected)
+        # Guard against both paths falling back to the black header
+        self.assertTrue(expected.any())
+    
+    def test_fractal_header_cuda_fallback(self):
+        """Test that a failing GPU render falls back to the CPU kernel."""
+        if utils.numba is None:
+            self.skipTest("Numba is not installed")
+        
+        expected = np.array(utils.create_fractal_header(64, 32))
+        with mock.patch.object(utils, "_CUDA_MIN_PIXELS", 1), \
+                mock.patch.object(utils.cuda, "is_available", return_value=True), \
+                mock.patch.object(utils, "_mandelbrot_cuda",
+                                  side_effect=RuntimeError("no device")) as gpu:
+            header = utils.create_fractal_header(64, 32)
+        
+        gpu.assert_called_once()
+        np.testing.assert_array_equal(np.array(header), expected)
+        self.assertTrue(expected.any())
+    
     @classmethod
     def tearDownClass(cls):
         """Clean up test environment."""
@@ -6,27 +6,61 @@ Author: Craig444444444
 """
 
 import os
+import sys
+import time
 import numpy as np
 from PIL import Image
 import hashlib
-from typing import Tuple
+from typing import Iterable, List, Tuple, Union
 from datetime import datetime
 
+try:
+    import numba
+    from numba import cuda
+except ImportError:  # Numba is optional; pure Python/NumPy paths are used instead
+    numba = None
+    cuda = None
+
+# Golden ratio, shared by all φ-modulated computations
+PHI = (1 + 5 ** 0.5) / 2
+
+# (x, y) header coordinates of the 8 checksum bits, laid out 50 pixels per row
+_CHECKSUM_COORDS = tuple((i % 50, i // 50) for i in range(8))
+
+# Fractal headers at least this many pixels are rendered on a CUDA GPU when
+# one is available; below it, transfer and launch overhead outweighs the gain
+_CUDA_MIN_PIXELS = 1 << 20
+
 def generate_pq_hash(data: str, length: int = 64) -> str:
     """
     Generate a pseudo quantum-resistant hash.
-    Uses multiple rounds of SHA3 with quantum-inspired salt.
+    Uses a single SHAKE256 (SHA-3 family) pass with quantum-inspired salt,
+    squeezing exactly as many bytes as the requested hex length needs.
     """
+    return _pq_hash(data, os.urandom(8), length)
+
+def generate_pq_hash_batch(items: Iterable[str], length: int = 64) -> List[str]:
+    """
+    Generate pseudo quantum-resistant hashes for several inputs.
+    Each input gets its own salt, but all salt entropy is drawn in a
+    single os.urandom call.
+    """
+    items = list(items)
+    entropy = os.urandom(8 * len(items))
+    return [
+        _pq_hash(data, entropy[8 * i:8 * i + 8], length)
+        for i, data in enumerate(items)
+    ]
+
+def _pq_hash(data: str, entropy: bytes, length: int) -> str:
+    """Hash data with a φ-derived salt built from 8 bytes of entropy."""
     # Quantum-inspired salt generation using golden ratio
-    phi = (1 + 5 ** 0.5) / 2
-    salt = str(phi * int.from_bytes(os.urandom(8), 'big')).encode()
+    salt = str(PHI * int.from_bytes(entropy, 'big')).encode()
     
-    # Multiple rounds of hashing
-    hash_value = hashlib.sha3_512(data.encode() + salt).digest()
-    for _ in range(3):  # Triple-round hashing
-        hash_value = hashlib.sha3_512(hash_value + salt).digest()
-    
-    return hash_value.hex()[:length]
+    h = hashlib.shake_256()
+    h.update(data.encode())
+    h.update(salt)
+    return h.hexdigest((length + 1) // 2)[:length]
 
 def create_fractal_header(width: int, height: int) -> Image.Image:
     """
@@ -34,27 +68,70 @@ def create_fractal_header(width: int, height: int) -> Image.Image:
     Uses Mandelbrot set with φ-modulated coloring.
     """
     try:
-        x = np.linspace(-2.0, 1.0, width)
-        y = np.linspace(-1.5, 1.5, height)
-        X, Y = np.meshgrid(x, y)
-        C = X + 1j * Y
-        Z = np.zeros_like(C)
-        div_time = np.zeros(C.shape, dtype=int)
+        # Single precision is ample for 8-bit output and halves memory traffic
+        x = np.linspace(-2.0, 1.0, width, dtype=np.float32)
+        y = np.linspace(-1.5, 1.5, height, dtype=np.float32)
         
         # φ-modulated iteration limit
-        phi = (1 + 5 ** 0.5) / 2
+        phi = PHI
         max_iter = int(100 * phi) % 256
         
+        # φ-modulated normalization of every possible escape time, so the
+        # per-pixel colouring is a single byte lookup
+        lut = np.uint8(np.arange(max_iter) / max_iter * phi % 1 * 255)
+        
+        if numba is not None:
+            fractal = None
+            if width * height >= _CUDA_MIN_PIXELS and cuda.is_available():
+                try:
+                    fractal = _mandelbrot_cuda(x, y, max_iter, lut)
+                except Exception:
+                    # JIT, driver or device memory failure: use the CPU kernel
+                    fractal = None
+            if fractal is None:
+                fractal = np.empty((height, width), dtype=np.uint8)
+                _mandelbrot_kernel(x, y, max_iter, lut, fractal)
+            return Image.fromarray(fractal).convert("RGB")
+        
+        # Separate real/imaginary float32 planes (rather than complex64) so
+        # this path rounds exactly like the scalar Numba kernel
+        cr = np.broadcast_to(x[None, :], (height, width)).ravel()
+        ci = np.broadcast_to(y[:, None], (height, width)).ravel()
+        div_time = np.zeros((height, width), dtype=np.uint8)
+        
+        # Iterate only the pixels that have not escaped yet: `active` holds
+        # their flat indices and z/c their compacted values
+        active = np.arange(cr.size)
+        zr = np.zeros_like(cr)
+        zi = np.zeros_like(ci)
+        zr2 = np.zeros_like(cr)
+        zi2 = np.zeros_like(ci)
+        flat_div_time = div_time.ravel()
+        
         for i in range(max_iter):
-            Z = Z**2 + C
-            diverge = np.abs(Z) > 2
-            div_now = diverge & (div_time == 0)
-            div_time[div_now] = i
-            Z[diverge] = 2
+            # z = z^2 + c, reusing the squares from the escape test
+            zi *= zr
+            zi *= 2
+            zi += ci
+            np.subtract(zr2, zi2, out=zr)
+            zr += cr
+            np.multiply(zr, zr, out=zr2)
+            np.multiply(zi, zi, out=zi2)
+            # |z| > 2 without the sqrt
+            escaped = zr2 + zi2 > 4
+            if escaped.any():
+                # Time 0 is reserved for "never escaped"; any |c| > 2 that
+                # escapes at i = 0 also escapes at i = 1, so it records 1
+                flat_div_time[active[escaped]] = max(i, 1)
+                remaining = ~escaped
+                active = active[remaining]
+                zr, zi, zr2, zi2 = (zr[remaining], zi[remaining],
+                                    zr2[remaining], zi2[remaining])
+                cr, ci = cr[remaining], ci[remaining]
+                if active.size == 0:
+                    break
             
-        # φ-modulated normalization
-        norm = (div_time / max_iter * phi) % 1 * 255
-        fractal = np.uint8(norm)
+        fractal = lut[div_time]
         
         return Image.fromarray(fractal).convert("RGB")
         
@@ -62,38 +139,131 @@ def create_fractal_header(width: int, height: int) -> Image.Image:
         # Fallback to black header
         return Image.new("RGB", (width, height), color="black")
 
-def calculate_checksum(img: Image.Image, region: Tuple[int, int, int, int]) -> int:
+if numba is not None:
+    @numba.njit(cache=True, parallel=True)
+    def _mandelbrot_kernel(xs, ys, max_iter, lut, out):
+        """
+        Per-pixel escape-time kernel matching the NumPy path.
+        
+        As there, time 0 means "never escaped" and first-iteration escapes
+        record 1, the iteration at which they are guaranteed to diverge.
+        """
+        for row in numba.prange(ys.size):
+            cy = ys[row]
+            for col in range(xs.size):
+                cx = xs[col]
+                zr = zi = zr2 = zi2 = np.float32(0.0)
+                div_time = 0
+                for i in range(max_iter):
+                    zi = np.float32(2.0) * zr * zi + cy
+                    zr = zr2 - zi2 + cx
+                    zr2 = zr * zr
+                    zi2 = zi * zi
+                    if zr2 + zi2 > np.float32(4.0):
+                        div_time = max(i, 1)
+                        break
+                out[row, col] = lut[div_time]
+
+    @cuda.jit
+    def _mandelbrot_cuda_kernel(xs, ys, max_iter, lut, out):
+        """One-thread-per-pixel CUDA form of _mandelbrot_kernel."""
+        col, row = cuda.grid(2)
+        if row >= ys.size or col >= xs.size:
+            return
+        cx = xs[col]
+        cy = ys[row]
+        zr = zi = zr2 = zi2 = np.float32(0.0)
+        div_time = 0
+        for i in range(max_iter):
+            zi = np.float32(2.0) * zr * zi + cy
+            zr = zr2 - zi2 + cx
+            zr2 = zr * zr
+            zi2 = zi * zi
+            if zr2 + zi2 > np.float32(4.0):
+                div_time = max(i, 1)
+                break
+        out[row, col] = lut[div_time]
+
+    def _mandelbrot_cuda(xs, ys, max_iter, lut):
+        """Render the escape-time image on the GPU and copy it back."""
+        out = cuda.device_array((ys.size, xs.size), dtype=np.uint8)
+        threads = (16, 16)
+        blocks = ((xs.size + threads[0] - 1) // threads[0],
+                  (ys.size + threads[1] - 1) // threads[1])
+        _mandelbrot_cuda_kernel[blocks, threads](
+            cuda.to_device(xs), cuda.to_device(ys), max_iter,
+            cuda.to_device(lut), out,
+        )
+        return out.copy_to_host()
+
+def calculate_checksum(img: Union[Image.Image, np.ndarray],
+                       region: Tuple[int, int, int, int]) -> int:
     """
     Calculate quantum-inspired checksum for image region.
     
     Args:
-        img: PIL Image to calculate checksum for
+        img: PIL Image, or an (H, W, 3) uint8 array already converted from
+            one, to calculate checksum for. Passing the array lets callers
+            checksum several regions without re-converting the image.
         region: Tuple of (x1, y1, x2, y2) defining the region
         
     Returns:
         int: Calculated checksum value
     """
     x1, y1, x2, y2 = region
-    width, height = img.size
+    if isinstance(img, np.ndarray):
+        height, width = img.shape[:2]
+    else:
+        width, height = img.size
     x1 = max(0, min(x1, width-1))
     y1 = max(0, min(y1, height-1))
     x2 = max(x1, min(x2, width))
     y2 = max(y1, min(y2, height))
     
     try:
-        checksum = 0
-        phi = (1 + 5 ** 0.5) / 2
-        
-        for x in range(x1, x2):
-            for y in range(y1, y2):
-                r, g, b = img.getpixel((x, y))
-                # φ-modulated checksum calculation
-                checksum = int((checksum + r + g + b) * phi) % 256
+        if isinstance(img, np.ndarray):
+            region_array = img[y1:y2, x1:x2]
+        else:
+            region_array = np.asarray(img.crop((x1, y1, x2, y2)))
+        if region_array.ndim != 3 or region_array.shape[2] != 3:
+            raise ValueError("expected an RGB image")
         
-        return checksum
+        # Treat the region as contiguous (N, 3) channel samples and reduce
+        # across channels in one pass, widening to int64 only in the sum.
+        # Sums follow the original column-major (x outer, y inner) order,
+        # since the φ-modulated recurrence is order dependent.
+        sums = region_array.sum(axis=2, dtype=np.int64).T.ravel()
+        if numba is None:
+            sums = sums.tolist()
+        return _checksum_reduce(sums, PHI)
     except Exception:
         return -1
 
+def _checksum_reduce(sums, phi: float) -> int:
+    """Fold per-pixel channel sums into the φ-modulated checksum."""
+    checksum = 0
+    for s in sums:
+        checksum = int((checksum + s) * phi) % 256
+    return checksum
+
+if numba is not None:
+    _checksum_reduce = numba.njit(cache=True)(_checksum_reduce)
+
+def _checksum_header(img: Image.Image) -> Image.Image:
+    """Crop the header pixels that carry the checksum bits."""
+    width = max(x for x, _ in _CHECKSUM_COORDS) + 1
+    height = max(y for _, y in _CHECKSUM_COORDS) + 1
+    if img.width < width or img.height < height:
+        raise IndexError("image too small for checksum header")
+    return img.crop((0, 0, width, height))
+
+def _checksum_offsets(header: Image.Image) -> list:
+    """Byte offsets of each checksum pixel's red sample in header.tobytes()."""
+    bands = len(header.getbands())
+    if bands < 3:
+        raise ValueError(f"expected an RGB image, got mode {header.mode}")
+    return [(y * header.width + x) * bands for x, y in _CHECKSUM_COORDS]
+
 def embed_checksum(img: Image.Image, checksum: int) -> None:
     """
     Embed checksum into image header.
@@ -102,15 +272,16 @@ def embed_checksum(img: Image.Image, checksum: int) -> None:
         img: PIL Image to embed checksum into
         checksum: Integer checksum value to embed
     """
-    binary_checksum = format(checksum, '08b')
-    pixels = img.load()
-    
     try:
-        for i, bit in enumerate(binary_checksum):
-            x, y = i % 50, i // 50  # Using header region
-            r, g, b = pixels[x, y]
-            r = (r & ~1) | int(bit)
-            pixels[x, y] = (r, g, b)
+        if not 0 <= checksum <= 0xFF:
+            raise ValueError(f"checksum {checksum} does not fit in 8 bits")
+        header = _checksum_header(img)
+        buf = bytearray(header.tobytes())
+        for i, offset in enumerate(_checksum_offsets(header)):
+            bit = (checksum >> (7 - i)) & 1
+            buf[offset] = (buf[offset] & 0xFE) | bit
+        header.frombytes(bytes(buf))
+        img.paste(header, (0, 0))
     except Exception:
         pass
 
@@ -124,16 +295,13 @@ def extract_checksum(img: Image.Image) -> int:
     Returns:
         int: Extracted checksum value
     """
-    pixels = img.load()
-    binary_checksum = ""
-    
     try:
-        for i in range(8):
-            x, y = i % 50, i // 50  # Using header region
-            r, _, _ = pixels[x, y]
-            binary_checksum += str(r & 1)
-        
-        return int(binary_checksum, 2)
+        header = _checksum_header(img)
+        buf = header.tobytes()
+        checksum = 0
+        for offset in _checksum_offsets(header):
+            checksum = (checksum << 1) | (buf[offset] & 1)
+        return checksum
     except Exception:
         return -1
 
@@ -143,10 +311,8 @@ def log_operation(operation: str, timestamp: datetime = None) -> None:
     
     Args:
         operation: Description of the operation
-        timestamp: Optional timestamp, defaults to current UTC time
+        timestamp: Optional timestamp, defaults to the current time as
+            integer nanoseconds since the epoch
     """
-    if timestamp is None:
-        timestamp = datetime.utcnow()
-    
-    log_entry = f"[{timestamp.isoformat()}] {operation}"
-    print(log_entry)  # For development/debug
+    stamp = time.time_ns() if timestamp is None else timestamp.isoformat()
+    sys.stdout.write(f"[{stamp}] {operation}\n")  # For development/debug